@@ -1,14 +1,34 @@
 
-from flask import Flask, jsonify
+# Make sockets, sleeps and threads cooperative before anything imports them;
+# gunicorn's gevent worker (see render.yaml) relies on this for concurrency
+from gevent import monkey
+monkey.patch_all()
+
+from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 import requests
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice, zip_longest
 import os
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 import time
 import socket
 import logging
+import threading
+import base64
+import json
+import gzip
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import orjson
+import ijson
 from requests.adapters import HTTPAdapter
+import urllib3
 from urllib3.util.retry import Retry
 
 # ----------------------------------------
@@ -29,8 +49,28 @@ logger = logging.getLogger(__name__)
 # ----------------------------------------
 load_dotenv()
 
+class OrjsonProvider(JSONProvider):
+    """Serve jsonify() and request JSON through orjson instead of the stdlib encoder"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.config.update(
+    COMPRESS_ALGORITHM=['gzip', 'deflate'],
+    COMPRESS_MIN_SIZE=500,
+    COMPRESS_LEVEL=4
+)
 CORS(app)
+Compress(app)
 
 # ----------------------------------------
 # ThingsBoard Config
@@ -52,37 +92,144 @@ TELEMETRY_KEY_MAPPING = {
     'rmp': ['RMP', 'rmp', 'Rmp']
 }
 
+@lru_cache(maxsize=32)
+def build_keys_param(keys):
+    """Comma-joined ThingsBoard keys for our standardized keys, sorted for a stable URL"""
+    tb_keys = set()
+    for key in keys:
+        tb_keys.update(TELEMETRY_KEY_MAPPING.get(key.lower(), [key]))
+    return ','.join(sorted(tb_keys))
+
+# Reverse lookup (ThingsBoard key -> (standardized key, alias rank)), built once at import;
+# the rank is the alias's position in TELEMETRY_KEY_MAPPING, lower wins
+REVERSE_KEY_MAP = {
+    alias: (standard_key, rank)
+    for standard_key, aliases in TELEMETRY_KEY_MAPPING.items()
+    for rank, alias in enumerate(aliases)
+}
+
+# ----------------------------------------
+# DNS Cache
+# ----------------------------------------
+# New pool connections to ThingsBoard reuse a cached lookup instead of
+# resolving the host again; the hostname itself is untouched so TLS/SNI still work
+THINGSBOARD_HOSTNAME = urlparse(THINGSBOARD_HOST).hostname
+DNS_CACHE_TTL = 300  # seconds
+_dns_cache = {}
+_system_getaddrinfo = socket.getaddrinfo
+
+def cached_getaddrinfo(host, *args, **kwargs):
+    if host != THINGSBOARD_HOSTNAME:
+        return _system_getaddrinfo(host, *args, **kwargs)
+
+    key = (host, args, tuple(sorted(kwargs.items())))
+    cached = _dns_cache.get(key)
+    if cached and time.monotonic() < cached[0]:
+        return cached[1]
+    try:
+        result = _system_getaddrinfo(host, *args, **kwargs)
+    except socket.gaierror:
+        if cached:
+            logger.warning(f"DNS lookup for {host} failed, reusing cached address")
+            return cached[1]
+        raise
+    _dns_cache[key] = (time.monotonic() + DNS_CACHE_TTL, result)
+    return result
+
+socket.getaddrinfo = cached_getaddrinfo
+
 # ----------------------------------------
 # Retry Setup
 # ----------------------------------------
 retry_strategy = Retry(
     total=3,
     backoff_factor=1,
-    status_forcelist=[408, 429, 500, 502, 503, 504]
+    status_forcelist=[408, 429, 500, 502, 503, 504],
+    allowed_methods=frozenset(['GET', 'POST'])  # POST /api/auth/login is safe to retry
+)
+# Sized so every Flask worker thread and EXECUTOR job can hold its own
+# kept-alive connection to ThingsBoard instead of opening throwaway ones
+adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    pool_block=False,
+    max_retries=retry_strategy
 )
-adapter = HTTPAdapter(max_retries=retry_strategy)
 http = requests.Session()
 http.mount("https://", adapter)
 http.mount("http://", adapter)
+http.headers.update({'Connection': 'keep-alive', 'Accept-Encoding': 'gzip, deflate'})
+
+# Shared pool for concurrent upstream fetches (see /api/telemetry/all)
+EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='tb-fetch')
+
+# ----------------------------------------
+# JWT Cache
+# ----------------------------------------
+_token_cache = {"username": None, "token": None, "exp": 0}
+_token_lock = threading.Lock()
+TOKEN_EXPIRY_MARGIN = 30  # seconds before 'exp' at which a token is refreshed
+
+def decode_token_exp(token):
+    """Read the 'exp' claim (epoch seconds) from a JWT payload, 0 if unreadable"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload)).get('exp', 0))
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return 0
+
+def cache_token(token):
+    _token_cache["username"] = USERNAME
+    _token_cache["token"] = token
+    _token_cache["exp"] = decode_token_exp(token)
+
+# Seed the cache with the configured token so it is used until it expires
+if JWT_TOKEN:
+    cache_token(JWT_TOKEN)
 
 # ----------------------------------------
 # Check Internet
 # ----------------------------------------
+NET_CHECK_INTERVAL = 30  # seconds between background connectivity probes
+_net_ok = True
+
 def check_internet_connection():
     try:
-        socket.create_connection(("8.8.8.8", 53), timeout=5)
+        socket.create_connection(("8.8.8.8", 53), timeout=5).close()
         return True
     except OSError:
         logger.warning("No internet connection available")
         return False
 
+def monitor_internet_connection():
+    """Refresh the cached connectivity flag so requests never wait on the probe"""
+    global _net_ok
+    while True:
+        _net_ok = check_internet_connection()
+        time.sleep(NET_CHECK_INTERVAL)
+
+threading.Thread(target=monitor_internet_connection, daemon=True).start()
+
 # ----------------------------------------
 # Get JWT
 # ----------------------------------------
-def get_auth_token():
-    if not check_internet_connection():
-        return None
-    for attempt in range(3):
+def get_auth_token(rejected_token=None):
+    """Return a cached JWT, logging in again only when it is missing, near expiry or rejected
+
+    Pass the token that just got a 401 as rejected_token; if another thread has
+    already replaced it by the time the lock is acquired, that token is reused.
+    """
+    with _token_lock:
+        cached = _token_cache["token"]
+        if cached and _token_cache["username"] == USERNAME:
+            if rejected_token is not None:
+                if cached != rejected_token:
+                    return cached
+            elif time.time() < _token_cache["exp"] - TOKEN_EXPIRY_MARGIN:
+                return cached
+
+        # Transient failures are already retried by the session's Retry policy
         try:
             response = http.post(
                 f"{THINGSBOARD_HOST}/api/auth/login",
@@ -93,18 +240,34 @@ def get_auth_token():
                 logger.error("Authentication failed")
                 return None
             response.raise_for_status()
-            return response.json().get('token')
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Attempt {attempt+1} failed: {e}")
-            if attempt < 2:
-                time.sleep(2 ** attempt)
-    return None
+            token = orjson.loads(response.content).get('token')
+            if token:
+                cache_token(token)
+            return token
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.warning(f"Login failed: {e}")
+            return None
 
 # ----------------------------------------
 # Fetch Telemetry
 # ----------------------------------------
+# Compared against Content-Length, which is the gzip-compressed size since the
+# session sends Accept-Encoding: gzip. Telemetry JSON compresses roughly 4x or
+# more, so 16KB on the wire is about 64KB decoded. Chunked responses carry no
+# Content-Length and are always buffered.
+STREAM_PARSE_MIN_WIRE_BYTES = 16 * 1024
+
+def parse_telemetry_body(response):
+    """Decode a streamed telemetry response, parsing large bodies incrementally"""
+    if int(response.headers.get('Content-Length') or 0) > STREAM_PARSE_MIN_WIRE_BYTES:
+        # Build the key -> series dict straight from the socket instead of
+        # buffering the whole body first; urllib3 undoes any gzip on the way
+        response.raw.decode_content = True
+        return dict(ijson.kvitems(response.raw, '', use_float=True))
+    return orjson.loads(response.content)
+
 def fetch_telemetry(token, keys=None, start_ts=None, end_ts=None, interval=None, limit=None):
-    if not token or not check_internet_connection():
+    if not token:
         return None
 
     try:
@@ -112,11 +275,7 @@ def fetch_telemetry(token, keys=None, start_ts=None, end_ts=None, interval=None,
         params = {}
 
         if keys:
-            # Convert our standardized keys to possible ThingsBoard keys
-            tb_keys = []
-            for key in keys:
-                tb_keys.extend(TELEMETRY_KEY_MAPPING.get(key.lower(), [key]))
-            params['keys'] = ','.join(set(tb_keys))  # Remove duplicates
+            params['keys'] = build_keys_param(tuple(keys))
         
         if start_ts:
             params['startTs'] = start_ts
@@ -131,46 +290,87 @@ def fetch_telemetry(token, keys=None, start_ts=None, end_ts=None, interval=None,
             url,
             headers={'X-Authorization': f'Bearer {token}'},
             params=params,
-            timeout=15
+            timeout=15,
+            stream=True
         )
 
         if response.status_code == 401:
             logger.info("Token expired, refreshing...")
-            new_token = get_auth_token()
+            response.close()
+            new_token = get_auth_token(rejected_token=token)
             if new_token:
                 response = http.get(
                     url,
                     headers={'X-Authorization': f'Bearer {new_token}'},
                     params=params,
-                    timeout=15
+                    timeout=15,
+                    stream=True
                 )
 
-        response.raise_for_status()
-        return response.json()
+        # Closing a streamed response returns its connection to the pool (or
+        # drops a half-read one) on every path, including raise_for_status()
+        with response:
+            response.raise_for_status()
+            return parse_telemetry_body(response)
 
-    except requests.exceptions.RequestException as e:
+    # ijson reads response.raw directly, so read failures surface as bare
+    # urllib3 errors rather than being wrapped by requests
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError,
+            orjson.JSONDecodeError, ijson.JSONError) as e:
         logger.error(f"Failed to fetch telemetry: {e}")
         return None
 
 # ----------------------------------------
 # Helper Functions
 # ----------------------------------------
-def find_matching_key(data, possible_keys):
-    """Find the first matching key in the data for any of the possible keys"""
-    for key in possible_keys:
-        if key in data:
-            return key
-    return None
+def resolve_keys(data):
+    """Map each standardized key to the ThingsBoard key present in the data, in one pass
+
+    When several aliases are present, the one listed first in TELEMETRY_KEY_MAPPING wins.
+    """
+    best = {}
+    for actual_key in data:
+        match = REVERSE_KEY_MAP.get(actual_key)
+        if match:
+            standard_key, rank = match
+            if standard_key not in best or rank < best[standard_key][0]:
+                best[standard_key] = (rank, actual_key)
+    return {standard_key: actual_key for standard_key, (rank, actual_key) in best.items()}
+
+@dataclass(slots=True)
+class TelemetryOut:
+    """Latest reading served by /api/telemetry; orjson serializes it in field order"""
+    power: float = 0.0
+    power_timestamp: int | None = None
+    voltage: float = 0.0
+    voltage_timestamp: int | None = None
+    current: float = 0.0
+    current_timestamp: int | None = None
+    frequency: float = 0.0
+    frequency_timestamp: int | None = None
+    rmp: float = 0.0
+    rmp_timestamp: int | None = None
+    energy: float = 0.0
+    energy_timestamp: int | None = None
+    powerfactor: float = 0.0
+    powerfactor_timestamp: int | None = None
+    timestamp: int = 0
+    online: bool = True
+    ngrok_url: str | None = None
+
+# Standardized key -> (value field, timestamp field) on TelemetryOut
+OUTPUT_FIELDS = {
+    standard_key: (field, f"{field}_timestamp")
+    for standard_key, field in (
+        ('power', 'power'), ('voltage', 'voltage'), ('current', 'current'),
+        ('frequency', 'frequency'), ('rmp', 'rmp'), ('energy', 'energy'),
+        ('powerfact', 'powerfactor')
+    )
+}
 
-def get_value_and_timestamp(data, standard_key):
-    """Get value and timestamp for a standard key, checking all possible variations"""
-    possible_keys = TELEMETRY_KEY_MAPPING.get(standard_key, [standard_key])
-    actual_key = find_matching_key(data, possible_keys)
-    
-    if not actual_key:
-        return 0.0, None
-    
-    entry = data.get(actual_key, [{}])[0]
+def get_value_and_timestamp(series):
+    """Get the latest value (as float) and timestamp from a ThingsBoard series"""
+    entry = (series or [{}])[0]
     try:
         value = float(entry.get("value", 0.0))
     except (ValueError, TypeError):
@@ -182,55 +382,63 @@ def process_telemetry_data(telemetry_data):
     if not telemetry_data:
         return None
 
-    # Get values using our standardized keys
-    power, power_ts = get_value_and_timestamp(telemetry_data, "power")
-    voltage, voltage_ts = get_value_and_timestamp(telemetry_data, "voltage")
-    current, current_ts = get_value_and_timestamp(telemetry_data, "current")
-    frequency, frequency_ts = get_value_and_timestamp(telemetry_data, "frequency")
-    rmp, rmp_ts = get_value_and_timestamp(telemetry_data, "rmp")
-    energy, energy_ts = get_value_and_timestamp(telemetry_data, "energy")
-    powerfact, powerfact_ts = get_value_and_timestamp(telemetry_data, "powerfact")
+    # Fill only the fields present in the response; the rest keep their defaults
+    processed = TelemetryOut(timestamp=time.time_ns() // 1_000_000)
+    for standard_key, actual_key in resolve_keys(telemetry_data).items():
+        value_field, ts_field = OUTPUT_FIELDS[standard_key]
+        value, ts = get_value_and_timestamp(telemetry_data[actual_key])
+        setattr(processed, value_field, value)
+        setattr(processed, ts_field, ts)
+    return processed
+
+RANGE_FIELDS = ('power', 'voltage', 'current', 'frequency', 'rmp', 'energy')
+
+def build_range_points(telemetry_data):
+    """Build the weekly/monthly point list, one point per power sample"""
+    key_map = resolve_keys(telemetry_data)
+    series = [telemetry_data.get(key_map.get(field), []) for field in RANGE_FIELDS]
+
+    # Walk all series in lockstep; shorter ones are padded with empty entries
+    rows = islice(zip_longest(*series, fillvalue={}), len(series[0]))
+    return [
+        {
+            "timestamp": p.get('ts'),
+            "power": p.get('value', 0),
+            "voltage": v.get('value', 0),
+            "current": c.get('value', 0),
+            "frequency": f.get('value', 0),
+            "rmp": r.get('value', 0),
+            "energy": e.get('value', 0)
+        }
+        for p, v, c, f, r, e in rows
+    ]
 
-    return {
-        "power": power,
-        "power_timestamp": power_ts,
-        "voltage": voltage,
-        "voltage_timestamp": voltage_ts,
-        "current": current,
-        "current_timestamp": current_ts,
-        "frequency": frequency,
-        "frequency_timestamp": frequency_ts,
-        "rmp": rmp,
-        "rmp_timestamp": rmp_ts,
-        "energy": energy,
-        "energy_timestamp": energy_ts,
-        "powerfactor": powerfact,
-        "powerfactor_timestamp": powerfact_ts,
-        "timestamp": int(time.time() * 1000),
-        "online": True
-    }
+DAY_MS = 24 * 60 * 60 * 1000
 
 def get_time_range(days):
-    end_ts = int(time.time() * 1000)
-    start_ts = end_ts - days * 24 * 60 * 60 * 1000
+    end_ts = time.time_ns() // 1_000_000
+    start_ts = end_ts - days * DAY_MS
     return start_ts, end_ts
 
-# ----------------------------------------
-# API Endpoints
-# ----------------------------------------
-@app.route('/api/telemetry')
-def get_telemetry():
-    token = JWT_TOKEN if JWT_TOKEN else get_auth_token()
-    if not token:
-        return jsonify({"error": "Authentication failed", "online": False}), 401
+@lru_cache(maxsize=64)
+def format_day(day_number):
+    """Format a day count since the epoch (UTC) as YYYY-MM-DD"""
+    return datetime.fromtimestamp(day_number * 86400, timezone.utc).strftime('%Y-%m-%d')
 
+RANGE_QUERIES = {
+    'weekly': {'days': 7, 'interval': 3600000, 'limit': 168, 'interval_name': 'hourly'},
+    'monthly': {'days': 30, 'interval': 86400000, 'limit': 30, 'interval_name': 'daily'}
+}
+
+def fetch_current_data(token):
+    """Fetch and format the latest telemetry, returning (payload, status)"""
     telemetry_data = fetch_telemetry(
         token, 
-        keys=['power', 'voltage', 'current', 'frequency', 'rmp', 'energy', 'powerfact', 'ngrok_url']
+        keys=('power', 'voltage', 'current', 'frequency', 'rmp', 'energy', 'powerfact', 'ngrok_url')
     )
     
     if not telemetry_data:
-        return jsonify({"error": "Could not fetch telemetry", "online": False}), 500
+        return {"error": "Could not fetch telemetry", "online": False}, 500
 
     processed = process_telemetry_data(telemetry_data)
 
@@ -243,146 +451,188 @@ def get_telemetry():
                 break
             except (KeyError, IndexError, TypeError):
                 continue
-    processed["ngrok_url"] = ngrok_url
-
-    return jsonify(processed)
+    processed.ngrok_url = ngrok_url
 
-@app.route('/api/telemetry/weekly')
-def get_weekly_telemetry():
-    token = JWT_TOKEN if JWT_TOKEN else get_auth_token()
-    if not token:
-        return jsonify({"error": "Authentication failed", "online": False}), 401
+    return processed, 200
 
-    start_ts, end_ts = get_time_range(7)
+def fetch_range_data(token, period):
+    """Fetch and format 'weekly' or 'monthly' telemetry, returning (payload, status)"""
+    query = RANGE_QUERIES[period]
+    start_ts, end_ts = get_time_range(query['days'])
     telemetry_data = fetch_telemetry(
         token,
-        keys=['power', 'voltage', 'current', 'frequency', 'rmp', 'energy'],
+        keys=RANGE_FIELDS,
         start_ts=start_ts,
         end_ts=end_ts,
-        interval=3600000,
-        limit=168
+        interval=query['interval'],
+        limit=query['limit']
     )
 
     if not telemetry_data:
-        return jsonify({"error": "Could not fetch weekly telemetry", "online": False}), 500
+        return {"error": f"Could not fetch {period} telemetry", "online": False}, 500
 
-    # Process the data points
-    processed_data = []
-    
-    # Get all possible power keys
-    power_keys = TELEMETRY_KEY_MAPPING.get('power', ['power'])
-    actual_power_key = find_matching_key(telemetry_data, power_keys) or 'power'
-    
-    # Get all possible voltage keys
-    voltage_keys = TELEMETRY_KEY_MAPPING.get('voltage', ['voltage'])
-    actual_voltage_key = find_matching_key(telemetry_data, voltage_keys) or 'voltage'
-    
-    # Similarly for other metrics
-    current_keys = TELEMETRY_KEY_MAPPING.get('current', ['current'])
-    actual_current_key = find_matching_key(telemetry_data, current_keys) or 'current'
-    
-    frequency_keys = TELEMETRY_KEY_MAPPING.get('frequency', ['frequency'])
-    actual_frequency_key = find_matching_key(telemetry_data, frequency_keys) or 'frequency'
-    
-    rmp_keys = TELEMETRY_KEY_MAPPING.get('rmp', ['rmp'])
-    actual_rmp_key = find_matching_key(telemetry_data, rmp_keys) or 'rmp'
-    
-    energy_keys = TELEMETRY_KEY_MAPPING.get('energy', ['energy'])
-    actual_energy_key = find_matching_key(telemetry_data, energy_keys) or 'energy'
-
-    # Get the maximum number of data points available
-    max_points = len(telemetry_data.get(actual_power_key, []))
-    
-    for i in range(max_points):
-        point = {
-            "timestamp": telemetry_data[actual_power_key][i]['ts'],
-            "power": telemetry_data[actual_power_key][i]['value'],
-            "voltage": telemetry_data[actual_voltage_key][i]['value'] if i < len(telemetry_data.get(actual_voltage_key, [])) else 0,
-            "current": telemetry_data[actual_current_key][i]['value'] if i < len(telemetry_data.get(actual_current_key, [])) else 0,
-            "frequency": telemetry_data[actual_frequency_key][i]['value'] if i < len(telemetry_data.get(actual_frequency_key, [])) else 0,
-            "rmp": telemetry_data[actual_rmp_key][i]['value'] if i < len(telemetry_data.get(actual_rmp_key, [])) else 0,
-            "energy": telemetry_data[actual_energy_key][i]['value'] if i < len(telemetry_data.get(actual_energy_key, [])) else 0
-        }
-        processed_data.append(point)
-
-    return jsonify({
-        "data": processed_data,
-        "start_date": datetime.fromtimestamp(start_ts / 1000).strftime('%Y-%m-%d'),
-        "end_date": datetime.fromtimestamp(end_ts / 1000).strftime('%Y-%m-%d'),
-        "interval": "hourly",
+    return {
+        "data": build_range_points(telemetry_data),
+        "start_date": format_day(start_ts // DAY_MS),
+        "end_date": format_day(end_ts // DAY_MS),
+        "interval": query['interval_name'],
         "online": True
-    })
+    }, 200
 
-@app.route('/api/telemetry/monthly')
-def get_monthly_telemetry():
-    token = JWT_TOKEN if JWT_TOKEN else get_auth_token()
+# ----------------------------------------
+# Response Cache
+# ----------------------------------------
+# Serialized bodies of successful responses, keyed by route; telemetry
+# changes every few seconds while the bucketed ranges are stable far longer
+RESPONSE_CACHE_TTLS = {'current': 5, 'weekly': 300, 'monthly': 1800}
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+# Misses currently being fetched, keyed like the cache; concurrent requests
+# for the same route wait on the leader's Future instead of hitting ThingsBoard
+SINGLE_FLIGHT_TIMEOUT = 60  # seconds a follower waits for the leader's result
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def get_cached_body(key):
+    with _response_cache_lock:
+        cached = _response_cache.get(key)
+    if cached and time.monotonic() < cached[0]:
+        return cached[1]
+    return None
+
+def load_payload(key, fetch, *args):
+    """Fetch and serialize a route's payload, caching it when successful"""
+    token = get_auth_token()
     if not token:
-        return jsonify({"error": "Authentication failed", "online": False}), 401
+        return orjson.dumps({"error": "Authentication failed", "online": False}), 401
+
+    payload, status = fetch(token, *args)
+    body = orjson.dumps(payload)
+    if status == 200:
+        with _response_cache_lock:
+            _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTLS[key], body)
+    return body, status
+
+def cached_payload(key, fetch, *args):
+    """Return (body, status) for a cached route, fetching at most once per miss"""
+    body = get_cached_body(key)
+    if body is not None:
+        return body, 200
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        try:
+            return future.result(timeout=SINGLE_FLIGHT_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning(f"Timed out waiting for in-flight {key} fetch")
+            return orjson.dumps({"error": "Telemetry fetch timed out", "online": False}), 504
 
-    start_ts, end_ts = get_time_range(30)
-    telemetry_data = fetch_telemetry(
-        token,
-        keys=['power', 'voltage', 'current', 'frequency', 'rmp', 'energy'],
-        start_ts=start_ts,
-        end_ts=end_ts,
-        interval=86400000,
-        limit=30
-    )
+    try:
+        # The previous leader may have filled the cache between our check and now
+        body = get_cached_body(key)
+        result = (body, 200) if body is not None else load_payload(key, fetch, *args)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+# Last gzipped body per route, so repeated cache hits skip recompression
+_gzip_cache = {}
+
+def gzip_body(key, body):
+    """gzip a route's body once per distinct content"""
+    with _response_cache_lock:
+        cached = _gzip_cache.get(key)
+    if cached and cached[0] == body:
+        return cached[1]
+    compressed = gzip.compress(body, compresslevel=app.config['COMPRESS_LEVEL'])
+    with _response_cache_lock:
+        _gzip_cache[key] = (body, compressed)
+    return compressed
+
+def json_response(body, status=200, key=None):
+    """JSON response for a serialized body, served precompressed when key is given"""
+    response = app.response_class(body, status=status, mimetype='application/json')
+    # Flask-Compress leaves responses that already carry a Content-Encoding alone
+    if (key and status == 200
+            and len(body) >= app.config['COMPRESS_MIN_SIZE']
+            and request.accept_encodings['gzip'] > 0):
+        response.set_data(gzip_body(key, body))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
 
-    if not telemetry_data:
-        return jsonify({"error": "Could not fetch monthly telemetry", "online": False}), 500
+# ----------------------------------------
+# API Endpoints
+# ----------------------------------------
+@app.route('/api/telemetry')
+def get_telemetry():
+    return json_response(*cached_payload('current', fetch_current_data), key='current')
 
-    # Process the data points (similar to weekly but with daily interval)
-    processed_data = []
-    
-    # Get all actual keys (same as weekly endpoint)
-    power_keys = TELEMETRY_KEY_MAPPING.get('power', ['power'])
-    actual_power_key = find_matching_key(telemetry_data, power_keys) or 'power'
-    
-    voltage_keys = TELEMETRY_KEY_MAPPING.get('voltage', ['voltage'])
-    actual_voltage_key = find_matching_key(telemetry_data, voltage_keys) or 'voltage'
-    
-    current_keys = TELEMETRY_KEY_MAPPING.get('current', ['current'])
-    actual_current_key = find_matching_key(telemetry_data, current_keys) or 'current'
-    
-    frequency_keys = TELEMETRY_KEY_MAPPING.get('frequency', ['frequency'])
-    actual_frequency_key = find_matching_key(telemetry_data, frequency_keys) or 'frequency'
-    
-    rmp_keys = TELEMETRY_KEY_MAPPING.get('rmp', ['rmp'])
-    actual_rmp_key = find_matching_key(telemetry_data, rmp_keys) or 'rmp'
-    
-    energy_keys = TELEMETRY_KEY_MAPPING.get('energy', ['energy'])
-    actual_energy_key = find_matching_key(telemetry_data, energy_keys) or 'energy'
+@app.route('/api/telemetry/weekly')
+def get_weekly_telemetry():
+    return json_response(*cached_payload('weekly', fetch_range_data, 'weekly'), key='weekly')
 
-    max_points = len(telemetry_data.get(actual_power_key, []))
-    
-    for i in range(max_points):
-        point = {
-            "timestamp": telemetry_data[actual_power_key][i]['ts'],
-            "power": telemetry_data[actual_power_key][i]['value'],
-            "voltage": telemetry_data[actual_voltage_key][i]['value'] if i < len(telemetry_data.get(actual_voltage_key, [])) else 0,
-            "current": telemetry_data[actual_current_key][i]['value'] if i < len(telemetry_data.get(actual_current_key, [])) else 0,
-            "frequency": telemetry_data[actual_frequency_key][i]['value'] if i < len(telemetry_data.get(actual_frequency_key, [])) else 0,
-            "rmp": telemetry_data[actual_rmp_key][i]['value'] if i < len(telemetry_data.get(actual_rmp_key, [])) else 0,
-            "energy": telemetry_data[actual_energy_key][i]['value'] if i < len(telemetry_data.get(actual_energy_key, [])) else 0
-        }
-        processed_data.append(point)
+@app.route('/api/telemetry/monthly')
+def get_monthly_telemetry():
+    return json_response(*cached_payload('monthly', fetch_range_data, 'monthly'), key='monthly')
 
-    return jsonify({
-        "data": processed_data,
-        "start_date": datetime.fromtimestamp(start_ts / 1000).strftime('%Y-%m-%d'),
-        "end_date": datetime.fromtimestamp(end_ts / 1000).strftime('%Y-%m-%d'),
-        "interval": "daily",
-        "online": True
-    })
+def section_payload(key, fetch, *args):
+    """cached_payload() for one section of /api/telemetry/all, turning a failure into its error body"""
+    try:
+        return cached_payload(key, fetch, *args)
+    except Exception:
+        logger.exception(f"Failed to build {key} telemetry section")
+        return orjson.dumps({"error": f"Could not fetch {key} telemetry", "online": False}), 500
+
+@app.route('/api/telemetry/all')
+def get_all_telemetry():
+    """Current, weekly and monthly telemetry in one response, fetched concurrently"""
+    # The range fetches run on the pool while this thread handles the
+    # current reading itself rather than idling until all three finish
+    futures = {
+        EXECUTOR.submit(section_payload, 'weekly', fetch_range_data, 'weekly'): 'weekly',
+        EXECUTOR.submit(section_payload, 'monthly', fetch_range_data, 'monthly'): 'monthly'
+    }
+    sections = {'current': section_payload('current', fetch_current_data)}
+    for future in as_completed(futures):
+        sections[futures[future]] = future.result()
+
+    # Splice the already-serialized section bodies instead of re-encoding them
+    statuses = [status for _, status in sections.values()]
+    online = all(status == 200 for status in statuses)
+    body = b'{' + b','.join(
+        orjson.dumps(name) + b':' + sections[name][0]
+        for name in ('current', 'weekly', 'monthly')
+    ) + b',"online":' + orjson.dumps(online) + b'}'
+
+    if any(status == 200 for status in statuses):
+        return json_response(body, key='all')
+    return json_response(body, 401 if all(status == 401 for status in statuses) else 500)
 
 @app.route('/health')
 def health_check():
     return jsonify({
         "status": "running",
-        "thingsboard_accessible": check_internet_connection(),
+        "thingsboard_accessible": _net_ok,
         "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     })
+
+# Log in ahead of the first request so it finds a cached token and an
+# open TLS connection in the pool instead of paying for both
+if USERNAME and PASSWORD:
+    EXECUTOR.submit(get_auth_token)
+
 if __name__ == '__main__':
     __import__('threading').Thread(target=lambda: __import__('subprocess').Popen(['python', 'ping.py']), daemon=True).start()
     logger.info("Starting ThingsBoard Data Fetcher Service")
@@ -1,12 +1,19 @@
 import time
 import requests
+from requests.adapters import HTTPAdapter
 
 # Replace this with your actual Render URL (your deployed server)
 URL = "https://iems-backend.onrender.com"
+PING_INTERVAL = 180  # seconds (3 minutes)
+
+# Dedicated one-connection session so pings reuse a single kept-alive connection
+ping_http = requests.Session()
+ping_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+ping_http.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
 
 def ping_render():
     try:
-        response = requests.get(URL, timeout=10)
+        response = ping_http.get(URL, timeout=3)
         if response.status_code == 200:
             print(f"[✓] Ping successful at {time.ctime()}")
         else:
@@ -15,7 +22,10 @@ def ping_render():
         print(f"[X] Ping error at {time.ctime()}: {e}")
 
 if __name__ == "__main__":
+    # Schedule against fixed deadlines so slow pings don't push later ones back
+    next_run = time.monotonic()
     while True:
         ping_render()
-        time.sleep(180)  # Sleep for 180 seconds (3 minutes)
+        next_run += PING_INTERVAL
+        time.sleep(max(0, next_run - time.monotonic()))
 